@@ -1 +1 @@
-from .helpers import _as_nexus_file, _partition
\ No newline at end of file
+from .helpers import _as_nexus_file, _partition, _partition_single
\ No newline at end of file
@@ -57,4 +57,23 @@ def _partition(data: Dataset, out_path, num_partitions: int, num_loci: int, num_
 
 	p = Pool(num_cores)
 
-	return p.map(func, part_files)
\ No newline at end of file
+	return p.map(func, part_files)
+
+
+def _partition_single(data: Dataset, out_path, num_cores: int):
+	"""
+	Fast path of _partition for a single partition over all the loci.
+
+	Args:
+		data (Dataset): dataset to partition
+		out_path: path to the output (temp) folder
+		num_cores (int): kept for signature parity with _partition; a single
+			network needs no worker pool
+	"""
+	loci = list(range(data.num_loci))
+
+	part_file = _as_nexus_file(data, out_path, loci)
+
+	sn = SplitNetwork()
+
+	return sn.execute_nexus_file(part_file)
\ No newline at end of file
@@ -1,6 +1,274 @@
 from ..dataset.dataset import Dataset
-from ..dataset.helpers import _partition
+from ..dataset.helpers import _partition_single
 import numpy as np
+import hashlib
+import os
+import platform
+import warnings
+from contextlib import contextmanager
+from functools import singledispatch
+from joblib import Parallel, delayed, parallel_backend
+from joblib.parallel import get_active_backend
+from ..helper import random_string
+from ..settings import os_name
+
+# Partitions below this many cells run single-threaded: pool startup
+# outweighs the compute on small problems
+_MIN_PARALLEL_SIZE = 1000000
+
+try:
+	from numba import njit, prange
+
+	@njit(cache=True, parallel=True)
+	def _gather_excluding(partition, exclude_indices):
+		num_samples = partition.shape[0]
+
+		keep = np.ones(num_samples, dtype=np.bool_)
+		for i in exclude_indices:
+			keep[i] = False
+
+		num_kept = num_samples - exclude_indices.shape[0]
+		indices = np.empty(num_kept, dtype=np.intp)
+		position = 0
+		for i in range(num_samples):
+			if keep[i]:
+				indices[position] = i
+				position += 1
+
+		out = np.empty((num_kept, partition.shape[1]), dtype=partition.dtype)
+		for row in prange(num_kept):
+			out[row] = partition[indices[row]]
+
+		return out
+
+	@njit(cache=True, parallel=True)
+	def _majority_vote(votes, num_classes):
+		num_samples = votes.shape[1]
+		out = np.empty(num_samples, dtype=np.intp)
+
+		for sample in prange(num_samples):
+			counts = np.zeros(num_classes, dtype=np.int16)
+			for tree in range(votes.shape[0]):
+				counts[votes[tree, sample]] += 1
+
+			best = 0
+			for cls in range(1, num_classes):
+				if counts[cls] > counts[best]:
+					best = cls
+			out[sample] = best
+
+		return out
+
+except ImportError:
+	_gather_excluding = None
+
+	def _majority_vote(votes, num_classes):
+		num_samples = votes.shape[1]
+		counts = np.zeros((num_samples, num_classes), dtype=np.int16)
+		rows = np.arange(num_samples)
+
+		for tree_votes in votes:
+			counts[rows, tree_votes] += 1
+
+		return np.argmax(counts, axis=1)
+
+
+def _dataset_digest(dataset: Dataset):
+	"""
+	Stable digest of a dataset's contents, used to key partitions on disk.
+	Args:
+		dataset (Dataset): loaded dataset to fingerprint
+	Note:
+		Hashes the source file path, its size and modification time together
+		with the loci count and the per-sample identifiers and populations.
+		The genotype calls themselves are never held in memory, so a file
+		rewritten in place with identical size and mtime would still collide;
+		any normal re-export changes at least one of the two and invalidates
+		the cached partition.
+	"""
+	digest = hashlib.blake2b(digest_size=16)
+
+	digest.update(str(dataset._file_path).encode())
+	file_stats = os.stat(dataset._file_path)
+	digest.update(str(file_stats.st_size).encode())
+	digest.update(str(file_stats.st_mtime).encode())
+	digest.update(str(dataset.num_loci).encode())
+	for identifier, population in zip(dataset.identifiers, dataset.populations):
+		digest.update(identifier.encode())
+		digest.update(str(population).encode())
+
+	return digest.hexdigest()
+
+
+@contextmanager
+def _set_njobs(classifier, n_cores: int):
+	"""
+	Temporarily sets n_jobs on a sklearn classifier, restoring the
+		previous value on exit.
+	Args:
+		classifier: sklearn classifier (sklearn.ensemble).
+		n_cores (int): number of cores to use for the wrapped call
+	Note:
+		Classifiers without an n_jobs parameter are left untouched, as is a
+		classifier running inside an active joblib backend (e.g. a
+		Model.worker_pool() block or an outer cross-validation loop) where
+		overriding n_jobs would oversubscribe the pool.
+	"""
+	if not hasattr(classifier, 'n_jobs') or get_active_backend()[1] is not None:
+		yield classifier
+		return
+
+	previous = classifier.n_jobs
+	classifier.n_jobs = n_cores
+	try:
+		yield classifier
+	finally:
+		classifier.n_jobs = previous
+
+
+def _accumulate_proba(estimators, partition, out):
+	"""
+	Sums the class probabilities of every estimator over a chunk of samples.
+	Args:
+		estimators: fitted sub-estimators of an sklearn ensemble
+		partition (np.ndarray): chunk of partition rows to score
+		out (np.ndarray): output rows, accumulated in place
+	"""
+	for estimator in estimators:
+		out += estimator.predict_proba(partition)
+
+
+def _compact_partition(partition):
+	"""
+	Downcasts a freshly generated partition to the smallest usable dtype.
+	Args:
+		partition (np.ndarray): partition matrix of shape (num_samples, num_features)
+	Note:
+		Split matrices are 0/1 indicators and are stored as uint8 (8x smaller
+		than the float64 NumPy produces by default); sklearn casts them to
+		float32 per call, batch by batch under the mini-batched predict_proba.
+		Anything else is stored as float32, the dtype sklearn trees use
+		internally, halving memory bandwidth into the tree code.
+	"""
+	partition = np.ascontiguousarray(partition)
+
+	if partition.dtype == np.uint8:
+		return partition
+
+	values = np.unique(partition)
+	if values.size <= 2 and np.isin(values, (0, 1)).all():
+		return partition.astype(np.uint8)
+
+	return np.ascontiguousarray(partition, dtype=np.float32)
+
+
+@singledispatch
+def _normalize_partitions(partitions):
+	"""
+	Coerces the partitions argument of fit/predict/predict_proba to a
+		single ndarray, dispatching on its type instead of re-running an
+		isinstance ladder on every call.
+	"""
+	raise ValueError("Either dataset of partitions must be provided")
+
+
+@_normalize_partitions.register(list)
+def _normalize_partitions_list(partitions):
+	return partitions[0]
+
+
+@_normalize_partitions.register(np.ndarray)
+def _normalize_partitions_ndarray(partitions):
+	return partitions
+
+
+def _canonical_exclude(exclude_indices, num_samples):
+	"""
+	Unique, in-range exclusion indices ready for either gather kernel.
+	Args:
+		exclude_indices: row indices to drop, possibly unsorted, duplicated or negative
+		num_samples (int): total number of rows
+	Note:
+		The numba kernel sizes its output from the index count and fills it
+		without bounds checks, so duplicates or out-of-range values would
+		silently corrupt the gather. Duplicates are dropped, negative indices
+		resolved from the end as NumPy would, and anything out of range
+		raises the same IndexError a boolean-mask assignment produces.
+	"""
+	exclude_indices = np.asarray(exclude_indices, dtype=np.intp)
+
+	if exclude_indices.size == 0:
+		return exclude_indices
+
+	exclude_indices = np.unique(np.where(exclude_indices < 0, exclude_indices + num_samples, exclude_indices))
+
+	if exclude_indices[0] < 0 or exclude_indices[-1] >= num_samples:
+		offending = exclude_indices[-1] if exclude_indices[-1] >= num_samples else exclude_indices[0] - num_samples
+		raise IndexError('index {0} is out of bounds for axis 0 with size {1}'.format(offending, num_samples))
+
+	return exclude_indices
+
+
+def _complement_index(num_samples, exclude_indices):
+	"""
+	Indices of the rows that survive an exclusion list.
+	Args:
+		num_samples (int): total number of rows
+		exclude_indices (np.ndarray): unique non-negative row indices to drop
+	Note:
+		When less than a quarter of the rows is excluded (typical k-fold
+		splits), the complement comes straight from setdiff1d, touching only
+		the surviving indices; heavier exclusions fall back to the full
+		boolean-mask scan, which is cheaper once most rows are dropped.
+		setdiff1d would silently ignore indices outside the row range, so
+		they are rejected up front with the IndexError the mask path raises.
+	"""
+	exclude_indices = np.asarray(exclude_indices, dtype=np.intp)
+
+	if exclude_indices.size and (exclude_indices.min() < 0 or exclude_indices.max() >= num_samples):
+		offending = exclude_indices.max() if exclude_indices.max() >= num_samples else exclude_indices.min()
+		raise IndexError('index {0} is out of bounds for axis 0 with size {1}'.format(offending, num_samples))
+
+	if len(exclude_indices) > 0.25 * num_samples:
+		keep = np.ones(num_samples, dtype=bool)
+		keep[exclude_indices] = False
+		return np.flatnonzero(keep)
+
+	return np.setdiff1d(np.arange(num_samples, dtype=np.intp), exclude_indices, assume_unique=True)
+
+
+def _apply_index_filter(partition, populations=None, include_indices=None, exclude_indices=None):
+	"""
+	Restricts partition rows (and matching populations) to the requested samples.
+	Args:
+		partition (np.ndarray): partition matrix of shape (num_samples, num_features)
+		populations (np.ndarray): per-sample labels, or None to filter the partition only
+		include_indices: indices of the samples to keep
+		exclude_indices: indices of the samples to drop (ignored if include_indices is given)
+	Note:
+		Both arrays are gathered with a single integer index so sklearn receives
+		C-contiguous inputs without an extra boolean-mask temporary per call.
+		When numba is available, the partition-only exclude path fuses mask
+		construction and row gathering into one compiled pass.
+	"""
+	if isinstance(include_indices, (np.ndarray, list)):
+		idx = np.asarray(include_indices, dtype=np.intp)
+	elif isinstance(exclude_indices, (np.ndarray, list)):
+		exclude_indices = _canonical_exclude(exclude_indices, partition.shape[0])
+
+		if _gather_excluding is not None and populations is None:
+			return _gather_excluding(partition, exclude_indices), None
+
+		idx = _complement_index(partition.shape[0], exclude_indices)
+	else:
+		return partition, populations
+
+	partition = partition[idx]
+	if populations is not None:
+		populations = populations[idx]
+
+	return partition, populations
+
 
 class Model:
 	'''
@@ -11,16 +279,28 @@ class Model:
 		RandomForestClassifier was used as a structure template (comments and names were taken from there):
 			https://scikit-learn.org/stable/modules/generated/sklearn.ensemble.RandomForestClassifier
 	'''
-	def __init__(self, classifier, service_path, **args):
+
+	# Number of samples fed to the classifier per predict_proba call, keeping
+	# peak memory at batch * n_trees * n_classes instead of the full dataset
+	_PREDICT_BATCH = 1024
+
+	def __init__(self, classifier, service_path, cache_to_disk: bool=True, **args):
 		"""
 		Inits the mycorrhiza model with supplementary classifier from sklearn system.
 		Args:
 			classifier: sklearn classifier (sklearn.ensemble).
 			service_path (str): Path to service folder that will be used as a temp storage for temp files.
+			cache_to_disk (bool): persist generated partitions under service_path/partitions
+				so other processes working on the same dataset can reuse them
 			**args: all the other arguments to initialize classifier
 		"""
 		self.clf = classifier(**args)
 		self.service_path = service_path
+		self.cache_to_disk = cache_to_disk
+		self._partition_cache = {}
+		self._small_partition_warned = False
+		self._last_proba = None
+		self._label_encoder = None
 
 	@property
 	def base_estimator_(self):
@@ -40,7 +320,14 @@ class Model:
 	def classes_(self):
 		'''
 		The classes labels (single output problem), or a list of arrays of class labels (multi-output problem).
+
+		Note:
+			When the model was fitted through Model.fit, labels are the original
+			population names; the wrapped classifier only ever sees their
+			integer codes.
 		'''
+		if self._label_encoder is not None:
+			return self._label_encoder
 		return self.clf.classes_
 
 	@property
@@ -95,6 +382,9 @@ class Model:
 			If dataset is given, partitions will be ignored.
 			If partitions is given, dataset and populations arguments will be ignored.
 			Populations is required in case partitions scenario
+			Population labels are encoded to integer class indices before
+			reaching the classifier; classes_ and predict still expose the
+			original labels.
 
 		Advice:
 			Try to utilize model._get_partition(dataset, n_cores) to obtain partition and then use it in the method.
@@ -104,32 +394,26 @@ class Model:
 			if not dataset.num_samples:
 				dataset.load()
 			if not isinstance(populations, np.ndarray):
-				populations = np.array(dataset.populations)
+				populations = np.asarray(dataset.populations)
 
 			partition = self._get_partition(dataset=dataset, n_cores=n_cores)
 
-		elif isinstance(partitions, list):
-			partition = partitions[0]
-		elif isinstance(partitions, np.ndarray):
-			partition = partitions
 		else:
-			raise ValueError("Either dataset of partitions must be provided")
+			partition = _normalize_partitions(partitions)
 
 		if isinstance(populations, list):
 			populations = np.array(populations)
 		elif not isinstance(populations, np.ndarray):
 			raise ValueError("Populations must be provided")
 
-		if isinstance(include_indices, (np.ndarray,list)):
-			partition = partition[include_indices]
-			populations = populations[include_indices]
-		elif isinstance(exclude_indices, (np.ndarray,list)):
-			include_indices = np.full(partition.shape[0], True, dtype=bool)
-			include_indices[exclude_indices] = False
-			partition = partition[include_indices]
-			populations = populations[include_indices]
+		partition, populations = _apply_index_filter(partition, populations, include_indices, exclude_indices)
 
-		self.clf.fit(partition, populations)
+		self._label_encoder, codes = np.unique(populations, return_inverse=True)
+
+		with _set_njobs(self.clf, self._effective_n_jobs(partition, n_cores)):
+			self.clf.fit(partition, codes.astype(np.int32))
+
+		self._last_proba = None
 
 		return self
 
@@ -146,6 +430,9 @@ class Model:
 		Note:
 			If dataset is given, partitions will be ignored.
 			If partitions is given, dataset argument will be ignored.
+			With several cores, samples are scored in parallel row chunks
+			accumulated into a single shared buffer, so memory stays O(n_samples)
+			instead of growing with the number of trees.
 
 		Advice:
 			Try to utilize model._get_partition(dataset, n_cores) to obtain partition and then use it in the method.
@@ -156,21 +443,49 @@ class Model:
 				dataset.load()
 
 			partition = self._get_partition(dataset=dataset, n_cores=n_cores)
-		elif isinstance(partitions, list):
-			partition = partitions[0]
-		elif isinstance(partitions, np.ndarray):
-			partition = partitions
 		else:
-			raise ValueError("Either dataset of partitions must be provided")
+			partition = _normalize_partitions(partitions)
 
-		if isinstance(include_indices, (np.ndarray,list)):
-			partition = partition[include_indices]
-		elif isinstance(exclude_indices, (np.ndarray,list)):
-			include_indices = np.full(partition.shape[0], True, dtype=bool)
-			include_indices[exclude_indices] = False
-			partition = partition[include_indices]
+		partition, _ = _apply_index_filter(partition, include_indices=include_indices, exclude_indices=exclude_indices)
 
-		return self.clf.predict_proba(partition)
+		return self._predict_proba_partition(partition, self._effective_n_jobs(partition, n_cores))
+
+	def _predict_proba_partition(self, partition, n_jobs: int):
+		"""
+		Computes class probabilities for an already filtered partition.
+		Args:
+			partition (np.ndarray): partition rows to score
+			n_jobs (int): effective number of cores to use
+		Note:
+			The last (partition, probabilities) pair is kept so that repeated
+			predict_proba calls on the same partition walk the forest only
+			once. The partition is matched by identity.
+		"""
+		if self._last_proba is not None and self._last_proba[0] is partition:
+			return self._last_proba[1]
+
+		num_samples = partition.shape[0]
+		n_jobs = min(n_jobs, num_samples)
+
+		if n_jobs > 1 and hasattr(self.clf, 'estimators_'):
+			proba = np.zeros((num_samples, len(self.clf.classes_)), dtype=np.float32)
+			bounds = np.linspace(0, num_samples, n_jobs + 1, dtype=np.intp)
+
+			Parallel(n_jobs=n_jobs, backend='threading')(
+				delayed(_accumulate_proba)(self.clf.estimators_, partition[start:stop], proba[start:stop])
+				for start, stop in zip(bounds[:-1], bounds[1:]))
+
+			proba /= len(self.clf.estimators_)
+		else:
+			proba = np.empty((num_samples, len(self.clf.classes_)), dtype=np.float32)
+			with _set_njobs(self.clf, n_jobs):
+				for start in range(0, num_samples, self._PREDICT_BATCH):
+					stop = start + self._PREDICT_BATCH
+					proba[start:stop] = self.clf.predict_proba(partition[start:stop])
+
+		self._last_proba = (partition, proba)
+
+		return proba
 
 	def predict(self, dataset: Dataset=None, partitions=None, n_cores: int=1,
 			include_indices: list=None, exclude_indices: list=None):
@@ -185,6 +500,9 @@ class Model:
 		Note:
 			If dataset is given, partitions will be ignored.
 			If partitions is given, dataset argument will be ignored.
+			Ensembles are always resolved by majority vote over the raw
+			per-tree predictions, regardless of any cached probabilities, so
+			the returned labels do not depend on call order.
 
 		Advice:
 			Try to utilize model._get_partition(dataset, n_cores) to obtain partition and then use it in the method.
@@ -195,30 +513,167 @@ class Model:
 				dataset.load()
 
 			partition = self._get_partition(dataset=dataset, n_cores=n_cores)
-		elif isinstance(partitions, list):
-			partition = partitions[0]
-		elif isinstance(partitions, np.ndarray):
-			partition = partitions
 		else:
-			raise ValueError("Either dataset of partitions must be provided")
+			partition = _normalize_partitions(partitions)
+
+		partition, _ = _apply_index_filter(partition, include_indices=include_indices, exclude_indices=exclude_indices)
+
+		if hasattr(self.clf, 'estimators_'):
+			return self.classes_.take(self._vote_partition(partition))
+
+		proba = self._predict_proba_partition(partition, self._effective_n_jobs(partition, n_cores))
+
+		return self.classes_.take(np.argmax(proba, axis=1))
+
+	def _vote_partition(self, partition):
+		"""
+		Majority vote over the raw per-tree class predictions of an ensemble.
+		Args:
+			partition (np.ndarray): partition rows to classify
+		Note:
+			Collects each tree's predicted class index straight from its
+			underlying tree structure into an (n_trees, n_samples) int16 array
+			and counts votes per sample, skipping sklearn's float probability
+			accumulation entirely. The vote matrix takes 2 bytes per tree and
+			sample, against 8 * n_classes for the probability path.
+		"""
+		estimators = self.clf.estimators_
+		samples = np.ascontiguousarray(partition, dtype=np.float32)
+
+		votes = np.empty((len(estimators), samples.shape[0]), dtype=np.int16)
+		for tree, estimator in enumerate(estimators):
+			votes[tree] = np.argmax(estimator.tree_.predict(samples), axis=1)
+
+		return _majority_vote(votes, len(self.clf.classes_))
 
-		if isinstance(include_indices, (np.ndarray,list)):
-			partition = partition[include_indices]
-		elif isinstance(exclude_indices, (np.ndarray,list)):
-			include_indices = np.full(partition.shape[0], True, dtype=bool)
-			include_indices[exclude_indices] = False
-			partition = partition[include_indices]
+	def __getstate__(self):
+		"""
+		Pickles the model without its in-memory caches.
+		Note:
+			Outer joblib cross-validation pickles the model once per fold;
+			shipping cached partitions and probabilities would dwarf the
+			actual compute. Workers fall back on the disk cache instead,
+			reloading partitions memory-mapped from service_path so all
+			processes share one copy through the page cache.
+		"""
+		state = self.__dict__.copy()
+		state['_partition_cache'] = {}
+		state['_last_proba'] = None
+
+		return state
 
-		return self.clf.predict(partition)
+	def _effective_n_jobs(self, partition, n_cores: int):
+		"""
+		Number of cores actually worth using on a given partition.
+		Args:
+			partition (np.ndarray): partition the classifier is about to process
+			n_cores (int): number of cores requested by the caller
+		Note:
+			Thread startup dominates on small problems, so partitions under
+			_MIN_PARALLEL_SIZE cells run on a single core (warned once per
+			model). On Apple Silicon the count is capped at half the CPUs to
+			keep work off the efficiency cores.
+		"""
+		if n_cores > 1 and partition.size < _MIN_PARALLEL_SIZE:
+			if not self._small_partition_warned:
+				warnings.warn('Partition is too small to benefit from {0} cores; running on a single core.'.format(n_cores))
+				self._small_partition_warned = True
+			return 1
+
+		if os_name == 'Darwin' and platform.machine() == 'arm64':
+			return max(1, min(n_cores, os.cpu_count() // 2))
+
+		return n_cores
+
+	def worker_pool(self, n_cores: int=1):
+		"""
+		Context manager keeping a single joblib worker pool alive across calls.
+		Args:
+			n_cores (int): number of workers in the pool
+		Note:
+			Every sklearn fit/predict with n_jobs > 1 normally starts and tears
+			down its own pool, which dominates on small folds. Wrapping a
+			sequence as `with model.worker_pool(4): model.fit(...); model.predict(...)`
+			reuses one pool for all the calls; the model detects the active
+			backend and leaves the classifier's n_jobs untouched inside the block.
+		"""
+		return parallel_backend('loky', n_jobs=n_cores)
 
-	def _get_partition(self, dataset: Dataset=None, n_cores: int=1):
+	def clear_partition_cache(self):
+		"""
+		Empties the internal partition cache, forcing the next call
+			with a dataset to regenerate the partition.
+		"""
+		self._partition_cache = {}
+
+	def _get_partition(self, dataset: Dataset=None, n_cores: int=1, cache: bool=True):
 		"""
 		Obtain partition used for the class' methods.
 		Args:
 			dataset (Dataset): dataset to obtain partition
 			n_cores (int): number of cores to use for tree splitting
+			cache (bool): reuse a previously generated partition for the same dataset
 		Note:
 			The method generates single partition (1) with all the loci (0).
-			For other configurations use mycorrhiza.dataset.helpers._partition 
+			For other configurations use mycorrhiza.dataset.helpers._partition
+			Generated partitions are memoized so that back-to-back fit/predict
+			calls on the same dataset only pay the generation cost once.
+			Use clear_partition_cache() or cache=False to bypass.
+			Partitions are additionally attached to the dataset itself, so
+			several Model instances (e.g. different classifiers swept over the
+			same data) share a single ndarray instead of regenerating it each.
+			With cache_to_disk, partitions are also persisted under
+			service_path/partitions keyed by the dataset contents and loaded
+			memory-mapped, so repeated runs and worker processes share one
+			on-disk copy through the page cache instead of regenerating.
+			The partition is materialized once as a C-contiguous array, as
+			uint8 for 0/1 split matrices or float32 otherwise, so
+			fit/predict/predict_proba do not trigger a hidden full-size copy
+			in check_array. Callers passing partitions directly should match
+			this layout.
 		"""
-		return _partition(dataset, self.service_path, 1, 0, n_cores)[0]
\ No newline at end of file
+		key = (id(dataset), dataset.num_samples, n_cores)
+
+		if cache and key in self._partition_cache:
+			return self._partition_cache[key]
+
+		dataset_cache = getattr(dataset, '_partition_cache', None)
+		if dataset_cache is None:
+			dataset_cache = dataset._partition_cache = {}
+		dataset_key = (1, 0, n_cores)
+
+		if cache and dataset_key in dataset_cache:
+			partition = dataset_cache[dataset_key]
+			self._partition_cache[key] = partition
+			return partition
+
+		disk_path = None
+		if self.cache_to_disk:
+			disk_path = os.path.join(self.service_path, 'partitions', '{0}.npy'.format(_dataset_digest(dataset)))
+
+			if os.path.isfile(disk_path):
+				partition = np.load(disk_path, mmap_mode='r')
+				if cache:
+					dataset_cache[dataset_key] = partition
+					self._partition_cache[key] = partition
+				return partition
+
+		partition = _compact_partition(_partition_single(dataset, self.service_path, n_cores))
+
+		if disk_path is not None:
+			os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+
+			# concurrent processes race on the digest-keyed path, so the file
+			# is staged next to it and renamed in, appearing only when complete
+			temp_path = '{0}.{1}.tmp'.format(disk_path, random_string(8))
+			with open(temp_path, 'wb') as fp:
+				np.save(fp, partition)
+			os.replace(temp_path, disk_path)
+
+			partition = np.load(disk_path, mmap_mode='r')
+
+		if cache:
+			dataset_cache[dataset_key] = partition
+			self._partition_cache[key] = partition
+
+		return partition
\ No newline at end of file
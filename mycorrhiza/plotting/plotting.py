@@ -5,13 +5,24 @@ import os
 import warnings
 warnings.simplefilter(action='ignore', category=UserWarning)
 
-import matplotlib as mpl
-if os.environ.get('DISPLAY','') == '':
-    print('no display found. Using non-interactive Agg backend')
-    mpl.use('Agg')
-import matplotlib.pyplot as plt
+
+def _import_pyplot():
+	try:
+		import matplotlib as mpl
+	except ImportError:
+		raise ImportError("matplotlib is required for plotting; install it with 'pip install mycorrhiza[plot]'.")
+
+	if os.environ.get('DISPLAY','') == '':
+		print('no display found. Using non-interactive Agg backend')
+		mpl.use('Agg')
+	import matplotlib.pyplot as plt
+
+	return plt
+
 
 def mixture_plot(result: Result, predictionOnly=False) -> None:
+	plt = _import_pyplot()
+
 	if predictionOnly:
 		sort_order = [i for i,x in enumerate(result.real_populations) if x =="ZZZ"]
 	else:
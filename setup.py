@@ -16,10 +16,12 @@ setuptools.setup(
         'tqdm',
         'numpy',
         'scikit-learn',
-        'pathos',
-        'scipy',
-        'matplotlib'
+        'joblib',
+        'pathos'
     ],
+    extras_require={
+        'plot': ['matplotlib>=3']
+    },
     python_requires='>=3',
     include_package_data=True,
     entry_points={
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from mycorrhiza.ml import Model
+
+
+@pytest.fixture
+def fitted_model(tmp_path):
+	rng = np.random.RandomState(0)
+	partition = np.ascontiguousarray(rng.randint(0, 2, size=(60, 20)), dtype=np.float32)
+	populations = np.repeat(['PopA', 'PopB', 'PopC'], 20)
+
+	model = Model(RandomForestClassifier, str(tmp_path), n_estimators=10, random_state=0)
+	model.fit(partitions=partition, populations=populations)
+
+	return model, partition, populations
+
+
+def test_predict_without_warm_proba_cache(fitted_model):
+	model, partition, populations = fitted_model
+
+	predicted = model.predict(partitions=partition)
+
+	assert predicted.shape == (partition.shape[0],)
+	assert set(predicted) <= set(populations)
+
+
+def test_predict_matches_after_predict_proba(fitted_model):
+	model, partition, _ = fitted_model
+
+	cold = model.predict(partitions=partition)
+	model.predict_proba(partitions=partition)
+	warm = model.predict(partitions=partition)
+
+	assert (cold == warm).all()